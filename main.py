@@ -1,21 +1,12 @@
+import importlib
 import os
 import sys
-import time
 
-# Import modules from src
-# Ensure __init__.py exists in src/ folder
-try:
-    from src import data_generator as generator
-    from src import predict as predictor
-    from src import train_model as trainer
-except ImportError:
-    # Handle import if running directly or file naming issues
-    # Renaming imports for cleaner access if Python complains about numbers in filenames
-    import importlib
 
-    generator = importlib.import_module("src.01_data_generator")
-    trainer = importlib.import_module("src.02_train_model")
-    predictor = importlib.import_module("src.03_predict")
+def load(name):
+    # Modules from src are imported on first use, so a prediction never pays
+    # for pandas, scikit-learn or the CST COM bindings.
+    return importlib.import_module(f"src.{name}")
 
 
 def clear_screen():
@@ -29,7 +20,8 @@ def print_header():
     print(" 1. [GENERATE] Run CST Automation & Collect Data")
     print(" 2. [TRAIN]    Train AI Model on CSV Data")
     print(" 3. [PREDICT]  Synthesize Antenna for Target Freq")
-    print(" 4. [EXIT]     Quit Application")
+    print(" 4. [REFINE]   Fine-tune Geometry for Target Freq/BW")
+    print(" 5. [EXIT]     Quit Application")
     print("------------------------------------------")
 
 
@@ -38,7 +30,7 @@ def main():
         clear_screen()
         print_header()
 
-        choice = input("Select an option (1-4): ").strip()
+        choice = input("Select an option (1-5): ").strip()
 
         if choice == "1":
             print("\n--- DATA GENERATION MODE ---")
@@ -55,7 +47,7 @@ def main():
 
                 confirm = input("Press ENTER to start (or 'q' to cancel)...")
                 if confirm.lower() != "q":
-                    generator.run_generator(num_samples=n, verbose=True)
+                    load("data_generator").run_generator(num_samples=n, verbose=True)
                     input("\n[DONE] Press Enter to return to menu...")
             except Exception as e:
                 print(f"\n[ERROR] Automation crashed: {e}")
@@ -64,7 +56,7 @@ def main():
         elif choice == "2":
             print("\n--- MODEL TRAINING MODE ---")
             try:
-                success = trainer.train_model(verbose=True)
+                success = load("train_model").train_model(verbose=True)
                 if success:
                     print("\n[SUCCESS] Model is ready for predictions.")
                 else:
@@ -80,7 +72,7 @@ def main():
                 freq_str = input("Enter Target Resonance Frequency (in GHz): ")
                 try:
                     freq = float(freq_str)
-                    predictor.predict_design(freq, verbose=True)
+                    load("predict").predict_design(freq, verbose=True)
                 except ValueError:
                     print("[ERROR] Invalid number format.")
 
@@ -90,6 +82,27 @@ def main():
                 input("Press Enter to continue...")
 
         elif choice == "4":
+            print("\n--- REFINEMENT MODE ---")
+            try:
+                freq_str = input("Enter Target Resonance Frequency (in GHz): ")
+                bw_str = input("Enter Target Bandwidth (in MHz, blank = any): ")
+                try:
+                    freq = float(freq_str)
+                    bw = float(bw_str) / 1000 if bw_str.strip() else None
+                except ValueError:
+                    print("[ERROR] Invalid number format.")
+                else:
+                    try:
+                        load("predict").refine_design(freq, bw, verbose=True)
+                    except ValueError as e:
+                        print(f"[ERROR] {e}")
+
+                input("Press Enter to return to menu...")
+            except Exception as e:
+                print(f"\n[ERROR] Refinement crashed: {e}")
+                input("Press Enter to continue...")
+
+        elif choice == "5":
             print("\nExiting... Good luck with your project!")
             sys.exit()
 
@@ -97,5 +110,48 @@ def main():
             input("\nInvalid option. Press Enter to try again...")
 
 
+def run_cli(args):
+    """Non-interactive entry point for scripts.
+
+    python main.py predict <freq_ghz>
+    python main.py refine <freq_ghz> [<bw_mhz>]
+
+    Exits 0 on success, 1 if no model is available, 2 on bad arguments
+    (including a bandwidth target the trained surrogate cannot honour) and
+    3 if refine cannot reach the target within PARAM_BOUNDS.
+    """
+    usage = "Usage: python main.py [predict <freq_ghz> | refine <freq_ghz> [<bw_mhz>]]"
+    if not args or args[0] not in ("predict", "refine") or not 2 <= len(args) <= 3:
+        print(usage)
+        return 2
+    if args[0] == "predict" and len(args) != 2:
+        print(usage)
+        return 2
+    try:
+        freq = float(args[1])
+        bw = float(args[2]) / 1000 if len(args) == 3 else None
+    except ValueError:
+        print("[ERROR] Invalid number format.")
+        return 2
+
+    predictor = load("predict")
+    if args[0] == "predict":
+        dims = predictor.predict_design(freq, verbose=False)
+        return 0 if dims is not None else 1
+
+    try:
+        refined = predictor.refine_design(freq, bw, verbose=False)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 2
+    if refined is None:
+        return 1
+    _, converged = refined
+    # Distinct from a missing model so pipelines can tell the two apart
+    return 0 if converged else 3
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main()
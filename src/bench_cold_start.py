@@ -0,0 +1,54 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Process start to printed prediction, in seconds
+COLD_START_BUDGET = 0.3
+RUNS = 5
+TARGET_FREQ = "2.4"
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules the predict path must never pull in
+HEAVY_MODULES = ["pandas", "sklearn", "joblib", "win32com", "matplotlib"]
+
+CHECK_IMPORTS = f"""
+import sys, main
+main.run_cli(["predict", "{TARGET_FREQ}"])
+print("HEAVY:" + ",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+"""
+
+
+def run_bench():
+    cmd = [sys.executable, "main.py", "predict", TARGET_FREQ]
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            print(proc.stdout + proc.stderr)
+            print("[BENCH] Prediction failed. Train and export the model first.")
+            return False
+
+    proc = subprocess.run(
+        [sys.executable, "-c", CHECK_IMPORTS], cwd=ROOT, capture_output=True, text=True
+    )
+    heavy = proc.stdout.rsplit("HEAVY:", 1)[-1].strip()
+
+    median = statistics.median(times)
+    print(f"[BENCH] Cold start (median of {RUNS}): {median * 1000:.0f} ms")
+    print(f"[BENCH] Budget: {COLD_START_BUDGET * 1000:.0f} ms")
+    if heavy:
+        print(f"[BENCH] FAIL: predict path imported {heavy}")
+        return False
+    if median > COLD_START_BUDGET:
+        print("[BENCH] FAIL: over budget.")
+        return False
+    print("[BENCH] OK")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_bench() else 1)
@@ -1,10 +1,12 @@
+import asyncio
 import os
 import random
-import time
 from datetime import datetime
 
 import pandas as pd
-import win32com.client
+
+from src import s11_metrics, solver_async
+from src.solver_backend import CSTBackend
 
 # Configuration
 CSV_PATH = os.path.join("data", "antenna_data.csv")
@@ -14,6 +16,8 @@ PARAM_BOUNDS = {
     "Ws": (2.0, 8.0),
     "Ls": (10.0, 20.0),
 }
+# A healthy solve takes 2-10 minutes; anything far beyond that has hung
+SOLVE_TIMEOUT = 30 * 60
 
 
 def log(msg, verbose):
@@ -21,7 +25,21 @@ def log(msg, verbose):
         print(f"[{datetime.now().strftime('%H:%M:%S')}] [GEN] {msg}")
 
 
-def run_generator(num_samples=10, verbose=True):
+def sample_params():
+    W = round(random.uniform(*PARAM_BOUNDS["W"]), 2)
+    L = round(random.uniform(*PARAM_BOUNDS["L"]), 2)
+
+    # Constraints
+    max_Ls = W - 4.0
+    max_Ws = (L / 2) - 2.0
+
+    Ls = round(random.uniform(10.0, max_Ls), 2)
+    Ws = round(random.uniform(2.0, max_Ws), 2)
+
+    return {"W": W, "L": L, "Ls": Ls, "Ws": Ws}
+
+
+def run_generator(num_samples=10, verbose=True, backends=None, timeout=SOLVE_TIMEOUT):
     log("Initializing Data Generator...", verbose)
 
     # Check directory
@@ -29,18 +47,8 @@ def run_generator(num_samples=10, verbose=True):
         os.makedirs("data")
         log("Created 'data' directory.", verbose)
 
-    # Connect to CST
-    try:
-        log("Attempting to connect to CST Studio COM Interface...", verbose)
-        cst = win32com.client.Dispatch("CSTStudio.Application")
-        mws = cst.Active3D()
-        if mws is None:
-            raise Exception("CST Active3D Object is None.")
-        log("Connected to Active CST Project.", verbose)
-    except Exception as e:
-        log(f"CRITICAL ERROR: Could not connect to CST. {e}", True)
-        log("Ensure CST is open and a project is loaded.", True)
-        return False
+    if backends is None:
+        backends = [CSTBackend()]
 
     data_log = []
 
@@ -53,72 +61,63 @@ def run_generator(num_samples=10, verbose=True):
         except:
             pass
 
-    log(f"Starting loop for {num_samples} new samples...", verbose)
-
-    for i in range(num_samples):
-        try:
-            # 1. Random Parameters
-            W = round(random.uniform(*PARAM_BOUNDS["W"]), 2)
-            L = round(random.uniform(*PARAM_BOUNDS["L"]), 2)
-
-            # Constraints
-            max_Ls = W - 4.0
-            max_Ws = (L / 2) - 2.0
-
-            Ls = round(random.uniform(10.0, max_Ls), 2)
-            Ws = round(random.uniform(2.0, max_Ws), 2)
-
-            params = {"W": W, "L": L, "Ls": Ls, "Ws": Ws}
-
-            log(f"Iter {i + 1}: Applying Params {params}", verbose)
-
-            # 2. Update CST
-            for key, val in params.items():
-                mws.StoreParameter(key, val)
-
-            # 3. Rebuild
-            log(f"Iter {i + 1}: Rebuilding Geometry...", verbose)
-            mws.RebuildOnParametricChange(False, False)
-
-            # 4. Solve
-            log(f"Iter {i + 1}: Starting Solver (This may take time)...", verbose)
-            solver = mws.Solver
-            solver.Start()
-
-            # 5. Extract Results
-            result_tree = mws.ResultTree
-            s11_obj = result_tree.GetResultFromTreeItem(
-                "1D Results\\S-Parameters\\S1,1", "3D:RunID:0"
+    # Raw spectra, kept so targets can be re-derived later without CST
+    spectra = s11_metrics.load_spectra()
+
+    done = 0
+
+    # Runs on the post-processing thread while the next sample solves
+    def on_result(result):
+        nonlocal done
+        i = result["job"]
+        if result["status"] == "ok":
+            metrics = s11_metrics.analyze_spectra(result["freqs"], result["mags"])
+
+            row = result["params"].copy()
+            for key in s11_metrics.SCALAR_METRICS:
+                row[key] = metrics[key][0].item()
+            data_log.append(row)
+            spectra.append((result["params"], result["freqs"], result["mags"]))
+            log(
+                f"Iter {i + 1}: SUCCESS -> Freq={row['res_freq']:.2f}GHz, "
+                f"S11={row['s11_min']:.2f}dB, BW={row['bandwidth'] * 1000:.0f}MHz",
+                verbose,
             )
-
-            if s11_obj:
-                mags = s11_obj.GetResultValuesY()
-                freqs = s11_obj.GetResultValuesX()
-
-                min_s11 = min(mags)
-                min_idx = mags.index(min_s11)
-                res_freq = freqs[min_idx]
-
-                row = params.copy()
-                row["res_freq"] = res_freq
-                row["s11_min"] = min_s11
-                data_log.append(row)
-                log(
-                    f"Iter {i + 1}: SUCCESS -> Freq={res_freq:.2f}GHz, S11={min_s11:.2f}dB",
-                    verbose,
-                )
-            else:
-                log(f"Iter {i + 1}: FAILED -> No S11 results found.", verbose)
-
-        except Exception as e:
-            log(f"Iter {i + 1}: ERROR -> {str(e)}", verbose)
+        elif result["status"] == "no_result":
+            log(f"Iter {i + 1}: FAILED -> No S11 results found.", verbose)
+        else:
+            status = result["status"].upper()
+            log(f"Iter {i + 1}: {status} -> {result['error']}", verbose)
 
         # Periodic Save
-        if i % 5 == 0:
+        if done % 5 == 0:
             pd.DataFrame(data_log).to_csv(CSV_PATH, index=False)
+            s11_metrics.save_spectra(spectra)
             log("Progress saved to CSV.", verbose)
+        done += 1
+
+    jobs = (sample_params() for _ in range(num_samples))
 
-    # Final Save
-    pd.DataFrame(data_log).to_csv(CSV_PATH, index=False)
-    log("Data Generation Complete.", verbose)
-    return True
+    log(
+        f"Starting loop for {num_samples} new samples on {len(backends)} solver(s)...",
+        verbose,
+    )
+    success = True
+    try:
+        asyncio.run(
+            solver_async.run_jobs(
+                backends, jobs, on_result=on_result, timeout=timeout, verbose=verbose
+            )
+        )
+    except Exception as e:
+        log(f"CRITICAL ERROR: Solver run stopped. {e}", True)
+        log("Ensure CST is open, a project is loaded and no solve is stuck.", True)
+        success = False
+    finally:
+        # Final Save, including whatever finished before a failure
+        pd.DataFrame(data_log).to_csv(CSV_PATH, index=False)
+        s11_metrics.save_spectra(spectra)
+
+    if success:
+        log("Data Generation Complete.", verbose)
+    return success
@@ -1,30 +1,68 @@
 import os
-import warnings
 
-import joblib
-import pandas as pd
+import numpy as np
 
-warnings.filterwarnings("ignore")
+from src import surrogate
 
 MODEL_PATH = os.path.join("models", "antenna_model.pkl")
+EXPORT_PATH = os.path.join("models", "antenna_model.npz")
+
+
+def load_model(path=EXPORT_PATH):
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def predict_forest(model, X):
+    """Evaluate an exported forest on X (n_samples, n_features) with NumPy only.
+
+    All trees of all outputs descend one level per step, so the loop runs
+    max_depth times regardless of forest size. Returns (n_samples, n_outputs).
+    """
+    # scikit-learn compares float32 features against its split thresholds
+    X = np.asarray(X, dtype=np.float32)
+    left, right = model["left"], model["right"]
+    n_out, n_trees, _ = left.shape
+
+    o = np.arange(n_out)[:, None, None]
+    t = np.arange(n_trees)[None, :, None]
+    s = np.arange(X.shape[0])[None, None, :]
+    node = np.zeros((n_out, n_trees, X.shape[0]), dtype=np.int32)
+
+    for _ in range(int(model["max_depth"])):
+        go_left = X[s, model["feature"][o, t, node]] <= model["threshold"][o, t, node]
+        child = np.where(go_left, left[o, t, node], right[o, t, node])
+        node = np.where(child < 0, node, child)
+
+    return model["value"][o, t, node].mean(axis=1).T
 
 
 def predict_design(target_freq, verbose=True):
-    if verbose:
-        print(f"\n[AI] Loading Model from {MODEL_PATH}...")
+    if os.path.exists(EXPORT_PATH):
+        if verbose:
+            print(f"\n[AI] Loading Model from {EXPORT_PATH}...")
+        model = load_model(EXPORT_PATH)
+        predict = lambda X: predict_forest(model, X)
+    elif os.path.exists(MODEL_PATH):
+        # Models trained before the NumPy export need the full sklearn stack
+        if verbose:
+            print(f"\n[AI] Loading Model from {MODEL_PATH}...")
+        import warnings
+
+        import joblib
+        import pandas as pd
 
-    if not os.path.exists(MODEL_PATH):
+        warnings.filterwarnings("ignore")
+        model = joblib.load(MODEL_PATH)
+        predict = lambda X: model.predict(pd.DataFrame(X, columns=["res_freq"]))
+    else:
         print("[ERROR] Model file not found! Train the model first.")
         return
 
-    model = joblib.load(MODEL_PATH)
-
-    input_data = pd.DataFrame([[target_freq]], columns=["res_freq"])
-
     if verbose:
         print(f"[AI] Predicting geometry for target: {target_freq} GHz...")
 
-    prediction = model.predict(input_data)
+    prediction = predict(np.array([[target_freq]]))
     dims = prediction[0]
 
     print("\n" + "=" * 40)
@@ -35,3 +73,60 @@ def predict_design(target_freq, verbose=True):
     print(f"  Slot Length (Ls) : {dims[2]:.3f} mm")
     print(f"  Slot Width (Ws)  : {dims[3]:.3f} mm")
     print("=" * 40 + "\n")
+    return dims
+
+
+def inverse_design(target_freqs, target_bws=None):
+    """Refine forest predictions for many targets at once through the surrogate.
+
+    target_bws may be None, or hold NaN for targets with no bandwidth goal.
+    Raises ValueError if bandwidth targets are given but the surrogate was
+    trained without a bandwidth objective.
+    Returns (dims (N, 4), achieved (N, n_obj), converged (N,)).
+    """
+    freqs = np.atleast_1d(np.asarray(target_freqs, dtype=float))
+    model = surrogate.load_surrogate()
+    targets = np.full((freqs.size, len(model["objectives"])), np.nan)
+    targets[:, 0] = freqs
+    if target_bws is not None and not np.all(np.isnan(target_bws)):
+        if "bandwidth" not in model["objectives"]:
+            raise ValueError(
+                "Surrogate was trained without bandwidth data; "
+                "regenerate the dataset and retrain to target bandwidth."
+            )
+        targets[:, model["objectives"].index("bandwidth")] = target_bws
+
+    X0 = predict_forest(load_model(EXPORT_PATH), freqs[:, None])
+    return surrogate.refine_designs(model, targets, X0)
+
+
+def refine_design(target_freq, target_bw=None, verbose=True):
+    """Print and return (dims, converged); None if no model is trained.
+
+    Raises ValueError for a bandwidth target the surrogate cannot honour.
+    """
+    if not os.path.exists(EXPORT_PATH) or not os.path.exists(surrogate.SURROGATE_PATH):
+        print("[ERROR] Surrogate not found! Train the model first.")
+        return
+
+    if verbose:
+        print(f"\n[AI] Refining geometry through {surrogate.SURROGATE_PATH}...")
+    bws = None if target_bw is None else [target_bw]
+    dims, achieved, converged = inverse_design([target_freq], bws)
+    dims, achieved, converged = dims[0], achieved[0], bool(converged[0])
+
+    print("\n" + "=" * 40)
+    print(f"  REFINED SYNTHESIS: {target_freq} GHz")
+    print("=" * 40)
+    print(f"  Patch Width (W)  : {dims[0]:.3f} mm")
+    print(f"  Patch Length (L) : {dims[1]:.3f} mm")
+    print(f"  Slot Length (Ls) : {dims[2]:.3f} mm")
+    print(f"  Slot Width (Ws)  : {dims[3]:.3f} mm")
+    print("-" * 40)
+    print(f"  Predicted Freq   : {achieved[0]:.4f} GHz")
+    if achieved.size > 1:
+        print(f"  Predicted BW     : {achieved[1] * 1000:.1f} MHz")
+    if not converged:
+        print("  [WARN] Target not reachable within PARAM_BOUNDS.")
+    print("=" * 40 + "\n")
+    return dims, converged
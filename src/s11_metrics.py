@@ -0,0 +1,208 @@
+import os
+
+import numpy as np
+
+SPECTRA_PATH = os.path.join("data", "spectra.npz")
+MATCH_THRESHOLD = -10.0  # dB, the usual "well matched" level for S11
+SCALAR_METRICS = (
+    "res_freq",
+    "s11_min",
+    "f_low",
+    "f_high",
+    "bandwidth",
+    "frac_bw",
+    "n_res",
+)
+
+
+def _as_batch(freqs, mags):
+    mags = np.atleast_2d(np.asarray(mags, dtype=float))
+    freqs = np.asarray(freqs, dtype=float)
+    freqs = np.broadcast_to(freqs, mags.shape)
+    return freqs, mags
+
+
+def _local_minima(mags, threshold):
+    """Boolean mask of interior grid points that are dips below threshold."""
+    is_min = np.zeros(mags.shape, dtype=bool)
+    mid = mags[:, 1:-1]
+    # Left side strict so flat-bottomed dips count once
+    is_min[:, 1:-1] = (mid < mags[:, :-2]) & (mid <= mags[:, 2:])
+    return is_min & (mags < threshold)
+
+
+def _parabolic_vertex(freqs, mags, idx):
+    """Refine minima at grid index idx (N, K; -1 = none) to sub-grid accuracy.
+
+    Fits a parabola through the minimum and its two neighbours, which need
+    not be evenly spaced. Points on the sweep edge keep their grid value.
+    """
+    n_pts = mags.shape[1]
+    valid = idx >= 0
+    i1 = np.clip(idx, 1, n_pts - 2)
+    x0, x1, x2 = (np.take_along_axis(freqs, i1 + k, axis=1) for k in (-1, 0, 1))
+    y0, y1, y2 = (np.take_along_axis(mags, i1 + k, axis=1) for k in (-1, 0, 1))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (y1 - y0) / (x1 - x0)
+        a = ((y2 - y1) / (x2 - x1) - d1) / (x2 - x0)
+        xv = np.clip(0.5 * (x0 + x1) - d1 / (2 * a), x0, x2)
+        yv = y0 + d1 * (xv - x0) + a * (xv - x0) * (xv - x1)
+
+    idx_safe = np.where(valid, idx, 0)
+    grid_f = np.take_along_axis(freqs, idx_safe, axis=1)
+    grid_m = np.take_along_axis(mags, idx_safe, axis=1)
+    interior = (idx >= 1) & (idx <= n_pts - 2) & (a > 0)
+
+    res_freq = np.where(interior, xv, grid_f)
+    res_s11 = np.where(interior, np.minimum(yv, grid_m), grid_m)
+    return np.where(valid, res_freq, np.nan), np.where(valid, res_s11, np.nan)
+
+
+def _band_edges(freqs, mags, idx, threshold):
+    """Interpolated threshold crossings either side of each minimum in idx.
+
+    A band running off the end of the sweep is cut at the sweep edge.
+    """
+    n_pts = mags.shape[1]
+    valid = idx >= 0
+    idx_safe = np.where(valid, idx, 0)
+    pos = np.arange(n_pts)
+    above = mags >= threshold
+
+    # Nearest point at or above threshold to the left / right of every index
+    left = np.maximum.accumulate(np.where(above, pos, -1), axis=1)
+    right = np.minimum.accumulate(np.where(above, pos, n_pts)[:, ::-1], axis=1)
+    right = right[:, ::-1]
+    lo = np.take_along_axis(left, idx_safe, axis=1)
+    hi = np.take_along_axis(right, idx_safe, axis=1)
+
+    def crossing(a, b):
+        fa, fb = np.take_along_axis(freqs, a, 1), np.take_along_axis(freqs, b, 1)
+        ma, mb = np.take_along_axis(mags, a, 1), np.take_along_axis(mags, b, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (threshold - ma) / (mb - ma)
+        return fa + np.nan_to_num(t) * (fb - fa)
+
+    f_low = np.where(
+        lo < 0, freqs[:, :1], crossing(np.maximum(lo, 0), np.clip(lo + 1, 0, n_pts - 1))
+    )
+    f_high = np.where(
+        hi >= n_pts,
+        freqs[:, -1:],
+        crossing(np.minimum(hi, n_pts - 1), np.clip(hi - 1, 0, n_pts - 1)),
+    )
+    return np.where(valid, f_low, np.nan), np.where(valid, f_high, np.nan)
+
+
+def analyze_spectra(freqs, mags, threshold=MATCH_THRESHOLD):
+    """Compute matching metrics for a batch of S11 spectra in one pass.
+
+    freqs -- (F,) shared sweep or (N, F) per-spectrum sweeps, in GHz
+    mags  -- (N, F) or (F,) S11 magnitudes in dB
+
+    Returns a dict of arrays. Per spectrum (shape N):
+        res_freq, s11_min  -- deepest dip, refined by parabolic interpolation
+        f_low, f_high      -- threshold crossings around that dip
+        bandwidth          -- f_high - f_low (0 when never below threshold)
+        frac_bw            -- bandwidth / res_freq
+        n_res              -- number of dips below threshold
+    Per resonance (shape N x K, NaN padded, sorted by frequency):
+        res_freqs, res_s11, res_f_low, res_f_high, res_bw
+    """
+    freqs, mags = _as_batch(freqs, mags)
+    n_spec = mags.shape[0]
+    rows = np.arange(n_spec)
+
+    # Deepest dip, whether or not it clears the threshold
+    best = np.argmin(mags, axis=1)[:, None]
+    res_freq, s11_min = _parabolic_vertex(freqs, mags, best)
+    # Decided on the grid sample, like _local_minima: the band edges are
+    # interpolated between samples, so a vertex that only dips below the
+    # threshold between them has no crossing to measure.
+    matched = mags[rows, best[:, 0]] < threshold
+    f_low, f_high = _band_edges(
+        freqs, mags, np.where(matched[:, None], best, -1), threshold
+    )
+
+    # Every dip below threshold, packed to the left of an (N, K) index array
+    is_min = _local_minima(mags, threshold)
+    is_min[rows, best[:, 0]] |= matched
+    n_res = is_min.sum(axis=1)
+    k = max(int(n_res.max(initial=0)), 1)
+    slot = np.cumsum(is_min, axis=1) - 1
+    res_idx = np.full((n_spec, k), -1)
+    r, c = np.nonzero(is_min)
+    res_idx[r, slot[r, c]] = c
+
+    res_freqs, res_s11 = _parabolic_vertex(freqs, mags, res_idx)
+    res_f_low, res_f_high = _band_edges(freqs, mags, res_idx, threshold)
+
+    bandwidth = np.nan_to_num(f_high - f_low)[:, 0]
+    return {
+        "res_freq": res_freq[:, 0],
+        "s11_min": s11_min[:, 0],
+        "f_low": f_low[:, 0],
+        "f_high": f_high[:, 0],
+        "bandwidth": bandwidth,
+        "frac_bw": bandwidth / res_freq[:, 0],
+        "n_res": n_res,
+        "res_freqs": res_freqs,
+        "res_s11": res_s11,
+        "res_f_low": res_f_low,
+        "res_f_high": res_f_high,
+        "res_bw": res_f_high - res_f_low,
+    }
+
+
+def save_spectra(records, path=SPECTRA_PATH):
+    """Write (params, freqs, mags) records to a single .npz archive.
+
+    Spectra are resampled onto the sweep of the first record, so a changed
+    solver sweep does not break the stacked arrays.
+    """
+    if not records:
+        return
+    names = list(records[0][0].keys())
+    grid = np.asarray(records[0][1], dtype=float)
+    mags = np.empty((len(records), grid.size))
+    for i, (_, f, m) in enumerate(records):
+        f = np.asarray(f, dtype=float)
+        m = np.asarray(m, dtype=float)
+        mags[i] = (
+            m
+            if f.shape == grid.shape and np.allclose(f, grid)
+            else np.interp(grid, f, m)
+        )
+    params = np.array([[p[n] for n in names] for p, _, _ in records], dtype=float)
+    np.savez(path, param_names=np.array(names), params=params, freqs=grid, mags=mags)
+
+
+def load_spectra(path=SPECTRA_PATH):
+    """Inverse of save_spectra: returns a list of (params, freqs, mags)."""
+    if not os.path.exists(path):
+        return []
+    with np.load(path) as data:
+        names = [str(n) for n in data["param_names"]]
+        freqs = data["freqs"]
+        return [
+            (dict(zip(names, p.tolist())), freqs, m)
+            for p, m in zip(data["params"], data["mags"])
+        ]
+
+
+def derive_targets(path=SPECTRA_PATH, threshold=MATCH_THRESHOLD):
+    """Recompute per-sample targets from stored spectra, without re-simulating.
+
+    Returns a dict of 1-D columns (geometry parameters plus the scalar
+    metrics of analyze_spectra) ready for pandas.DataFrame.
+    """
+    with np.load(path) as data:
+        names = [str(n) for n in data["param_names"]]
+        params = data["params"]
+        metrics = analyze_spectra(data["freqs"], data["mags"], threshold)
+
+    columns = {name: params[:, j] for j, name in enumerate(names)}
+    for key in SCALAR_METRICS:
+        columns[key] = metrics[key]
+    return columns
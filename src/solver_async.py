@@ -0,0 +1,250 @@
+import asyncio
+import queue
+import threading
+import time
+from datetime import datetime
+
+# Seconds to wait for a call to wind down after abort() before giving up on it
+ABORT_GRACE = 5.0
+# Deadline for the non-solve calls (parameter update + rebuild, S11 fetch)
+CALL_TIMEOUT = 5 * 60
+
+
+class CallTimeout(Exception):
+    """A backend call overran its deadline but was aborted cleanly."""
+
+
+class SolverHung(Exception):
+    """A backend call overran its deadline and could not be aborted.
+
+    The worker thread is still stuck inside the backend, so the backend is
+    retired for the rest of the run rather than fed more work.
+    """
+
+
+class SolverError(Exception):
+    """No backend is left to run the remaining jobs."""
+
+
+def log(msg, verbose):
+    if verbose:
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] [SOLVE] {msg}")
+
+
+def _deliver(loop, setter, fut, value):
+    try:
+        loop.call_soon_threadsafe(setter, fut, value)
+    except RuntimeError:
+        # An abandoned call finished after the event loop was closed
+        pass
+
+
+def _set_result(fut, value):
+    if not fut.done():
+        fut.set_result(value)
+
+
+def _set_exception(fut, exc):
+    if not fut.done():
+        fut.set_exception(exc)
+
+
+class _WorkerThread:
+    """Daemon thread running blocking calls one at a time, in submit order.
+
+    COM objects must be used from the thread that created them, so each
+    backend gets exactly one of these. It is a daemon so that a call which
+    never returns can be abandoned without blocking interpreter exit.
+    """
+
+    def __init__(self, name):
+        self._calls = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._calls.get()
+            if item is None:
+                return
+            loop, fut, fn, args = item
+            try:
+                value = fn(*args)
+            except BaseException as e:
+                _deliver(loop, _set_exception, fut, e)
+            else:
+                _deliver(loop, _set_result, fut, value)
+
+    def submit(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._calls.put((loop, fut, fn, args))
+        return fut
+
+    def stop(self):
+        self._calls.put(None)
+
+
+def _consume(fut):
+    # Marks the exception of a call we stopped waiting for as retrieved
+    if not fut.cancelled():
+        fut.exception()
+
+
+def _post_process(on_result, result):
+    try:
+        on_result(result)
+    except Exception as e:
+        log(f"Job {result['job'] + 1}: Post-processing failed -> {e}", True)
+
+
+async def _connect(backend, name, timeout, abort_grace):
+    worker = _WorkerThread(name)
+    try:
+        await _call(worker, backend, timeout, abort_grace, backend.connect)
+    except BaseException:
+        worker.stop()
+        raise
+    return worker
+
+
+async def _call(worker, backend, timeout, abort_grace, fn, *args):
+    """Run fn on the worker under a deadline.
+
+    On overrun the backend is asked to abort. Raises CallTimeout if the call
+    then winds down, SolverHung if it does not.
+    """
+    fut = worker.submit(fn, *args)
+    fut.add_done_callback(_consume)
+    try:
+        return await asyncio.wait_for(asyncio.shield(fut), timeout)
+    except asyncio.TimeoutError:
+        pass
+    except asyncio.CancelledError:
+        backend.abort()
+        raise
+
+    name = getattr(fn, "__name__", "call")
+    if backend.abort():
+        done, _ = await asyncio.wait({fut}, timeout=abort_grace)
+        if done:
+            raise CallTimeout(f"{name} exceeded {timeout}s timeout and was aborted.")
+    raise SolverHung(f"{name} exceeded {timeout}s timeout and could not be aborted.")
+
+
+async def _run_job(worker, backend, idx, params, timeout, call_timeout, abort_grace):
+    """Update, solve and fetch one job. SolverHung propagates to the caller."""
+    result = {
+        "job": idx,
+        "params": params,
+        "status": "error",
+        "freqs": None,
+        "mags": None,
+        "error": None,
+    }
+    start = time.perf_counter()
+    try:
+        await _call(
+            worker, backend, call_timeout, abort_grace, backend.apply_params, params
+        )
+        await _call(worker, backend, timeout, abort_grace, backend.solve)
+        s11 = await _call(worker, backend, call_timeout, abort_grace, backend.get_s11)
+        if s11 is None:
+            result["status"] = "no_result"
+        else:
+            result["freqs"], result["mags"] = s11
+            result["status"] = "ok"
+    except (CallTimeout, SolverHung) as e:
+        result["status"] = "timeout"
+        result["error"] = str(e)
+        if isinstance(e, SolverHung):
+            e.result = result
+            raise
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+async def run_jobs(
+    backends,
+    jobs,
+    on_result=None,
+    timeout=None,
+    call_timeout=CALL_TIMEOUT,
+    abort_grace=ABORT_GRACE,
+    verbose=True,
+):
+    """Solve every parameter set in `jobs` and return one result per job.
+
+    Each backend gets its own worker thread, so with several backends the
+    geometry update of one job overlaps the solve of another. `jobs` is
+    consumed lazily, so a generator can sample the next geometry while the
+    current one solves. `on_result` runs on a separate post-processing
+    thread and is not awaited by the solver, letting extraction and CSV
+    writes of job N overlap the solve of job N+1.
+
+    A solve running longer than `timeout` seconds (or a connect, parameter
+    update or result fetch longer than `call_timeout`) is aborted and reported with
+    status "timeout". A backend that fails to connect, or whose call cannot
+    be aborted, is retired while the others carry on; if jobs remain once
+    every backend is retired, SolverError is raised. Cancelling the task
+    aborts every running call. All post-processing has finished by the time
+    this returns or raises.
+
+    Result dicts carry job, params, status ("ok", "no_result", "timeout" or
+    "error"), freqs, mags, error and elapsed.
+    """
+    job_iter = enumerate(jobs)
+    results = {}
+    failures = []
+    post_futs = []
+    post = _WorkerThread("solver-post")
+
+    def record(result):
+        log(f"Job {result['job'] + 1}: {result['status'].upper()}", verbose)
+        results[result["job"]] = result
+        if on_result is not None:
+            post_futs.append(post.submit(_post_process, on_result, result))
+
+    async def drive(backend, name):
+        try:
+            worker = await _connect(backend, name, call_timeout, abort_grace)
+        except Exception as e:
+            failures.append(f"{name} failed to connect: {e}")
+            log(f"{name}: Connect failed -> {e}", True)
+            return
+        try:
+            for idx, params in job_iter:
+                log(f"Job {idx + 1}: Applying Params {params} on {name}", verbose)
+                try:
+                    result = await _run_job(
+                        worker, backend, idx, params, timeout, call_timeout, abort_grace
+                    )
+                except SolverHung as e:
+                    result = e.result
+                    record(result)
+                    failures.append(f"{name} hung: {result['error']}")
+                    log(f"{name}: Retired -> {result['error']}", True)
+                    return
+                record(result)
+        finally:
+            worker.stop()
+
+    tasks = [
+        asyncio.ensure_future(drive(b, f"solver-{i + 1}"))
+        for i, b in enumerate(backends)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*post_futs, return_exceptions=True)
+        post.stop()
+
+    if len(failures) == len(backends) and next(job_iter, None) is not None:
+        raise SolverError("; ".join(failures))
+    return [results[idx] for idx in sorted(results)]
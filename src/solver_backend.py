@@ -0,0 +1,119 @@
+import math
+import threading
+
+# Frequency sweep the CST project is set up with (see setup_design.py)
+FREQ_RANGE = (1.0, 5.0)
+S11_PATH = "1D Results\\S-Parameters\\S1,1"
+S11_RUN_ID = "3D:RunID:0"
+
+
+class SolverAborted(Exception):
+    pass
+
+
+class CSTBackend:
+    """Solver backend driving the running CST Studio instance over COM.
+
+    Every method is called from the same worker thread, which is why COM is
+    initialised in connect() rather than at import time.
+    """
+
+    def __init__(self):
+        self.mws = None
+
+    def connect(self):
+        import pythoncom
+        import win32com.client
+
+        pythoncom.CoInitialize()
+        cst = win32com.client.Dispatch("CSTStudio.Application")
+        mws = cst.Active3D()
+        if mws is None:
+            raise Exception("CST Active3D Object is None.")
+        self.mws = mws
+
+    def apply_params(self, params):
+        for key, val in params.items():
+            self.mws.StoreParameter(key, val)
+        self.mws.RebuildOnParametricChange(False, False)
+
+    def solve(self):
+        self.mws.Solver.Start()
+
+    def get_s11(self):
+        s11_obj = self.mws.ResultTree.GetResultFromTreeItem(S11_PATH, S11_RUN_ID)
+        if not s11_obj:
+            return None
+        freqs = list(s11_obj.GetResultValuesX())
+        mags = list(s11_obj.GetResultValuesY())
+        return freqs, mags
+
+    def abort(self):
+        # Solver.Start() blocks inside COM and CST exposes no way to interrupt
+        # it from another thread. The project is still busy afterwards, so
+        # the orchestrator retires this backend instead of reusing it.
+        return False
+
+
+class FakeSolverBackend:
+    """Local stand-in for CST that sleeps, hangs or fails on purpose.
+
+    The S11 curve is a single dip at the half-wave resonance of the patch
+    length, shifted down by the slot, which is enough to exercise the whole
+    pipeline without a licence.
+
+    solve_time -- seconds each solve sleeps for
+    hang_on    -- job numbers (1-based, in solve order) that never finish
+    fail_on    -- job numbers whose solve raises
+    abortable  -- whether abort() releases a hung solve
+    """
+
+    def __init__(
+        self, solve_time=0.05, hang_on=(), fail_on=(), abortable=True, points=1001
+    ):
+        self.solve_time = solve_time
+        self.hang_on = set(hang_on)
+        self.fail_on = set(fail_on)
+        self.abortable = abortable
+        self.points = points
+        self.params = None
+        self.solves = 0
+        self._abort = threading.Event()
+
+    def connect(self):
+        pass
+
+    def apply_params(self, params):
+        self.params = dict(params)
+
+    def solve(self):
+        self.solves += 1
+        self._abort.clear()
+        if self.solves in self.fail_on:
+            raise Exception(f"Fake solver failure on job {self.solves}.")
+        if self.solves in self.hang_on:
+            while not self._abort.wait(0.01):
+                pass
+            raise SolverAborted(f"Fake solve {self.solves} aborted.")
+        if self._abort.wait(self.solve_time):
+            raise SolverAborted(f"Fake solve {self.solves} aborted.")
+
+    def get_s11(self):
+        p = self.params
+        eps_eff = 3.8
+        f0 = 300.0 / (2 * p["L"] * math.sqrt(eps_eff))
+        f0 *= 1 - 0.01 * p["Ls"] * p["Ws"] / p["W"]
+        depth = 10 + 15 * min(p["Ws"], 6.0) / 6.0
+        q = 25.0
+
+        lo, hi = FREQ_RANGE
+        step = (hi - lo) / (self.points - 1)
+        freqs = [lo + k * step for k in range(self.points)]
+        mags = [-0.5 - depth / (1 + (q * (f - f0) / f0) ** 2) for f in freqs]
+        return freqs, mags
+
+    def abort(self):
+        if not self.abortable:
+            return False
+        self._abort.set()
+        return True
@@ -0,0 +1,226 @@
+import os
+
+import numpy as np
+
+SURROGATE_PATH = os.path.join("models", "surrogate.npz")
+GEOMETRY = ["W", "L", "Ls", "Ws"]
+HIDDEN = (64, 64)
+# A design has converged once every objective is within this many GHz
+TOLERANCE = 1e-3
+
+
+def init_mlp(n_in, n_out, hidden=HIDDEN, seed=42):
+    rng = np.random.default_rng(seed)
+    sizes = [n_in, *hidden, n_out]
+    layers = []
+    for a, b in zip(sizes[:-1], sizes[1:]):
+        # Glorot init keeps the tanh units out of saturation at the start
+        w = rng.normal(0.0, np.sqrt(2.0 / (a + b)), size=(a, b))
+        layers.append([w, np.zeros(b)])
+    return layers
+
+
+def _forward(layers, Z):
+    """Run the network on normalised inputs; returns output and activations."""
+    acts = []
+    h = Z
+    for w, b in layers[:-1]:
+        h = np.tanh(h @ w + b)
+        acts.append(h)
+    w, b = layers[-1]
+    return h @ w + b, acts
+
+
+def fit_mlp(Z, T, layers, epochs=3000, lr=3e-3, weight_decay=1e-5, verbose=False):
+    """Full-batch Adam on mean squared error with hand-written backprop.
+
+    Z and T must already be normalised. layers is updated in place.
+    """
+    params = [p for layer in layers for p in layer]
+    m = [np.zeros_like(p) for p in params]
+    v = [np.zeros_like(p) for p in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    grad_scale = 2.0 / T.size
+
+    for epoch in range(1, epochs + 1):
+        out, acts = _forward(layers, Z)
+        inputs = [Z, *acts]
+        delta = grad_scale * (out - T)
+
+        grads = [None] * len(params)
+        for i in range(len(layers) - 1, -1, -1):
+            w = layers[i][0]
+            grads[2 * i] = inputs[i].T @ delta + weight_decay * w
+            grads[2 * i + 1] = delta.sum(axis=0)
+            if i > 0:
+                delta = (delta @ w.T) * (1.0 - acts[i - 1] ** 2)
+
+        for p, g, mi, vi in zip(params, grads, m, v):
+            mi *= beta1
+            mi += (1 - beta1) * g
+            vi *= beta2
+            vi += (1 - beta2) * g * g
+            m_hat = mi / (1 - beta1**epoch)
+            v_hat = vi / (1 - beta2**epoch)
+            p -= lr * m_hat / (np.sqrt(v_hat) + eps)
+
+        if verbose and epoch % 500 == 0:
+            print(f"    epoch {epoch}: mse={np.mean((out - T) ** 2):.5f}")
+    return layers
+
+
+def save_surrogate(path, layers, x_lo, x_hi, y_mean, y_std, objectives, bounds):
+    arrays = {}
+    for i, (w, b) in enumerate(layers):
+        arrays[f"w{i}"] = w
+        arrays[f"b{i}"] = b
+    lo, hi = zip(*(bounds[name] for name in GEOMETRY))
+    np.savez(
+        path,
+        n_layers=len(layers),
+        x_lo=x_lo,
+        x_hi=x_hi,
+        y_mean=y_mean,
+        y_std=y_std,
+        objectives=np.array(objectives),
+        bounds_lo=np.array(lo),
+        bounds_hi=np.array(hi),
+        **arrays,
+    )
+
+
+def load_surrogate(path=SURROGATE_PATH):
+    with np.load(path) as data:
+        model = {key: data[key] for key in data.files}
+    model["layers"] = [
+        (model[f"w{i}"], model[f"b{i}"]) for i in range(int(model["n_layers"]))
+    ]
+    model["objectives"] = [str(o) for o in model["objectives"]]
+    return model
+
+
+def evaluate(model, X):
+    """Surrogate outputs (N, n_obj) and their Jacobian (N, n_obj, 4) wrt X.
+
+    X holds geometries in mm, columns ordered as GEOMETRY.
+    """
+    x_scale = 2.0 / (model["x_hi"] - model["x_lo"])
+    Z = (X - model["x_lo"]) * x_scale - 1.0
+    out, acts = _forward(model["layers"], Z)
+
+    # Back-propagate the identity from every output down to the inputs
+    layers = model["layers"]
+    jac = np.broadcast_to(layers[-1][0].T, (X.shape[0],) + layers[-1][0].T.shape)
+    for i in range(len(layers) - 2, -1, -1):
+        jac = (jac * (1.0 - acts[i] ** 2)[:, None, :]) @ layers[i][0].T
+
+    Y = out * model["y_std"] + model["y_mean"]
+    jac = jac * model["y_std"][None, :, None] * x_scale[None, None, :]
+    return Y, jac
+
+
+def project(X, lo, hi, iters=5):
+    """Pull geometries back into the box and the U-slot constraints.
+
+    Uses the constraints of data_generator.sample_params: the slot base must
+    leave 2 mm of patch either side (Ls <= W - 4) and the slot must fit in
+    half the patch (Ws <= L / 2 - 2). A few alternating projections get
+    close to the nearest feasible point; the slot is then trimmed so the
+    constraints hold exactly, not just asymptotically.
+    """
+    X = np.clip(X, lo, hi)
+    w, l, ls, ws = (GEOMETRY.index(n) for n in ("W", "L", "Ls", "Ws"))
+    for _ in range(iters):
+        # Onto the plane Ls - W = -4 along its normal (-1, 1)
+        over = np.maximum(X[:, ls] - X[:, w] + 4.0, 0.0) / 2.0
+        X[:, w] += over
+        X[:, ls] -= over
+        # Onto the plane Ws - L/2 = -2 along its normal (-1/2, 1)
+        over = np.maximum(X[:, ws] - X[:, l] / 2.0 + 2.0, 0.0) / 1.25
+        X[:, l] += over / 2.0
+        X[:, ws] -= over
+        X = np.clip(X, lo, hi)
+    X[:, ls] = np.maximum(np.minimum(X[:, ls], X[:, w] - 4.0), lo[ls])
+    X[:, ws] = np.maximum(np.minimum(X[:, ws], X[:, l] / 2.0 - 2.0), lo[ws])
+    return X
+
+
+def _lm_step(J, r, lam, eye):
+    JJt = J @ J.transpose(0, 2, 1) + lam[:, None, None] * eye
+    return -np.einsum("noi,no->ni", J, np.linalg.solve(JJt, r[..., None])[..., 0])
+
+
+def _levenberg_marquardt(model, targets, X0, max_steps, tol):
+    lo, hi = model["bounds_lo"], model["bounds_hi"]
+    span = hi - lo
+    free = np.isnan(targets)
+    weight = np.where(free, 0.0, 1.0) / model["y_std"]
+    targets = np.where(free, 0.0, targets)
+    eye = np.eye(targets.shape[1])
+
+    def residual(X):
+        Y, J = evaluate(model, X)
+        r = (Y - targets) * weight
+        return Y, r, J * weight[:, :, None] * span[None, None, :]
+
+    X = project(np.array(X0, dtype=float), lo, hi)
+    Y, r, J = residual(X)
+    loss = np.sum(r**2, axis=1)
+    lam = np.full(X.shape[0], 1e-3)
+
+    for _ in range(max_steps):
+        done = np.all(free | (np.abs(Y - targets) <= tol), axis=1)
+        if done.all():
+            break
+        du = _lm_step(J, r, lam, eye)
+        # Freeze parameters pinned at a bound that the step pushes further
+        # out, then re-solve so the remaining ones take up the slack.
+        pinned = ((X <= lo) & (du < 0)) | ((X >= hi) & (du > 0))
+        if pinned.any():
+            du = _lm_step(J * ~pinned[:, None, :], r, lam, eye)
+        X_new = project(X + du * span, lo, hi)
+        Y_new, r_new, J_new = residual(X_new)
+        loss_new = np.sum(r_new**2, axis=1)
+
+        better = (loss_new < loss) & ~done
+        X = np.where(better[:, None], X_new, X)
+        Y = np.where(better[:, None], Y_new, Y)
+        r = np.where(better[:, None], r_new, r)
+        J = np.where(better[:, None, None], J_new, J)
+        loss = np.where(better, loss_new, loss)
+        lam = np.where(better, lam * 0.3, np.minimum(lam * 10.0, 1e6))
+
+    converged = np.all(free | (np.abs(Y - targets) <= tol), axis=1)
+    return X, Y, converged
+
+
+def refine_designs(model, targets, X0, max_steps=100, tol=TOLERANCE):
+    """Batched Levenberg-Marquardt from X0 towards geometries hitting targets.
+
+    targets -- (N, n_obj) in the order of model["objectives"]; NaN entries
+               are left free
+    X0      -- (N, 4) starting geometries, e.g. from predict_design
+
+    There are fewer objectives than dimensions, so each step is the
+    minimum-norm update (in units of the parameter range), which keeps the
+    answer as close to the starting design as the targets allow.
+
+    Designs that stall (typically a start pinned in a corner of the box)
+    are retried once from the centre of PARAM_BOUNDS.
+
+    Returns (X, Y, converged) with Y the surrogate's outputs at X.
+    """
+    targets = np.atleast_2d(np.asarray(targets, dtype=float))
+    X, Y, converged = _levenberg_marquardt(model, targets, X0, max_steps, tol)
+
+    retry = ~converged
+    if retry.any():
+        centre = (model["bounds_lo"] + model["bounds_hi"]) / 2.0
+        X0_retry = np.tile(centre, (retry.sum(), 1))
+        X_r, Y_r, conv_r = _levenberg_marquardt(
+            model, targets[retry], X0_retry, max_steps, tol
+        )
+        idx = np.flatnonzero(retry)[conv_r]
+        X[idx], Y[idx] = X_r[conv_r], Y_r[conv_r]
+        converged[idx] = True
+    return X, Y, converged
@@ -9,8 +9,16 @@ from sklearn.metrics import mean_absolute_error, r2_score
 from sklearn.model_selection import train_test_split
 from sklearn.multioutput import MultiOutputRegressor
 
+from src import surrogate
+from src.data_generator import PARAM_BOUNDS
+from src.s11_metrics import MATCH_THRESHOLD
+
 DATA_PATH = os.path.join("data", "antenna_data.csv")
 MODEL_PATH = os.path.join("models", "antenna_model.pkl")
+# NumPy-only copy of the forest, loaded by predict.py without scikit-learn
+EXPORT_PATH = os.path.join("models", "antenna_model.npz")
+FEATURES = ["res_freq"]
+TARGETS = ["W", "L", "Ls", "Ws"]
 
 
 def log(msg, verbose):
@@ -45,8 +53,8 @@ def train_model(verbose=True):
         return False
 
     # Features & Targets
-    X = df[["res_freq"]]
-    y = df[["W", "L", "Ls", "Ws"]]
+    X = df[FEATURES]
+    y = df[TARGETS]
 
     log("Splitting Train/Test data...", verbose)
     X_train, X_test, y_train, y_test = train_test_split(
@@ -70,4 +78,94 @@ def train_model(verbose=True):
 
     joblib.dump(model, MODEL_PATH)
     log(f"Model saved successfully to {MODEL_PATH}", True)
+
+    export_model(model, EXPORT_PATH)
+    log(f"Exported NumPy runtime model to {EXPORT_PATH}", verbose)
+
+    train_surrogate(verbose)
+    return True
+
+
+def train_surrogate(verbose=True):
+    """Fit the smooth forward model (geometry -> performance) used by refine.
+
+    Only matched antennas are used, since bandwidth is zero (and the dip
+    frequency meaningless) for designs that never cross -10 dB.
+    """
+    df = pd.read_csv(DATA_PATH)
+    df = df[df["s11_min"] < MATCH_THRESHOLD]
+    objectives = ["res_freq"]
+    if "bandwidth" in df.columns:
+        objectives.append("bandwidth")
+    df = df.dropna(subset=objectives)
+    log(f"Training forward surrogate on {len(df)} matched samples...", verbose)
+
+    if len(df) < 10:
+        log("WARNING: Not enough matched samples for the surrogate. Skipping.", True)
+        return False
+
+    X = df[TARGETS].to_numpy(dtype=float)
+    Y = df[objectives].to_numpy(dtype=float)
+    X_train, X_test, Y_train, Y_test = train_test_split(
+        X, Y, test_size=0.2, random_state=42
+    )
+
+    x_lo, x_hi = X_train.min(axis=0), X_train.max(axis=0)
+    y_mean, y_std = Y_train.mean(axis=0), Y_train.std(axis=0) + 1e-12
+    Z = (X_train - x_lo) * 2.0 / (x_hi - x_lo) - 1.0
+    layers = surrogate.init_mlp(len(TARGETS), len(objectives))
+    surrogate.fit_mlp(Z, (Y_train - y_mean) / y_std, layers, verbose=verbose)
+
+    surrogate.save_surrogate(
+        surrogate.SURROGATE_PATH,
+        layers,
+        x_lo,
+        x_hi,
+        y_mean,
+        y_std,
+        objectives,
+        PARAM_BOUNDS,
+    )
+    Y_pred, _ = surrogate.evaluate(surrogate.load_surrogate(), X_test)
+    for j, name in enumerate(objectives):
+        mae = mean_absolute_error(Y_test[:, j], Y_pred[:, j])
+        log(f"Surrogate {name} MAE: {mae * 1000:.1f} MHz", True)
+    log(f"Surrogate saved to {surrogate.SURROGATE_PATH}", True)
     return True
+
+
+def export_model(model, path=EXPORT_PATH):
+    """Flatten a MultiOutputRegressor of forests into padded node arrays.
+
+    Arrays are shaped (outputs, trees, max_nodes); padding nodes are leaves.
+    """
+    trees = [[t.tree_ for t in est.estimators_] for est in model.estimators_]
+    n_out, n_trees = len(trees), len(trees[0])
+    n_nodes = max(t.node_count for ts in trees for t in ts)
+
+    left = np.full((n_out, n_trees, n_nodes), -1, dtype=np.int32)
+    right = np.full((n_out, n_trees, n_nodes), -1, dtype=np.int32)
+    feature = np.zeros((n_out, n_trees, n_nodes), dtype=np.int32)
+    threshold = np.zeros((n_out, n_trees, n_nodes))
+    value = np.zeros((n_out, n_trees, n_nodes))
+
+    for o, ts in enumerate(trees):
+        for k, t in enumerate(ts):
+            n = t.node_count
+            left[o, k, :n] = t.children_left
+            right[o, k, :n] = t.children_right
+            feature[o, k, :n] = np.maximum(t.feature, 0)
+            threshold[o, k, :n] = t.threshold
+            value[o, k, :n] = t.value[:, 0, 0]
+
+    np.savez(
+        path,
+        left=left,
+        right=right,
+        feature=feature,
+        threshold=threshold,
+        value=value,
+        max_depth=max(t.max_depth for ts in trees for t in ts),
+        features=np.array(FEATURES),
+        targets=np.array(TARGETS),
+    )
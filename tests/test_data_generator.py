@@ -0,0 +1,29 @@
+import pandas as pd
+
+from src import data_generator
+from src.solver_backend import FakeSolverBackend
+
+
+def test_hung_solver_stops_run_but_keeps_finished_samples(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    backend = FakeSolverBackend(solve_time=0.01, hang_on=[4], abortable=False)
+
+    ok = data_generator.run_generator(8, verbose=False, backends=[backend], timeout=0.2)
+
+    assert ok is False
+    assert len(pd.read_csv(data_generator.CSV_PATH)) == 3
+
+
+def test_failed_backend_does_not_lose_rows_from_healthy_one(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    class Down(FakeSolverBackend):
+        def connect(self):
+            raise Exception("down")
+
+    ok = data_generator.run_generator(
+        12, verbose=False, backends=[FakeSolverBackend(solve_time=0.01), Down()]
+    )
+
+    assert ok is True
+    assert len(pd.read_csv(data_generator.CSV_PATH)) == 12
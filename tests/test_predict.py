@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.multioutput import MultiOutputRegressor
+
+from src import predict, train_model
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def fit_forest():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(1.5, 4.5, size=(200, 1))
+    Y = np.hstack([30 + 5 * X, 40 - 3 * X, 12 + X**2, 8 - X]) + rng.normal(
+        0, 0.5, size=(200, 4)
+    )
+    model = MultiOutputRegressor(RandomForestRegressor(n_estimators=20, random_state=0))
+    return model.fit(X, Y)
+
+
+def test_exported_forest_matches_sklearn(tmp_path):
+    model = fit_forest()
+    path = tmp_path / "forest.npz"
+    train_model.export_model(model, path)
+
+    X = np.linspace(1.0, 5.0, 2001)[:, None]
+    np.testing.assert_array_equal(
+        predict.predict_forest(predict.load_model(path), X), model.predict(X)
+    )
+
+
+def test_predict_cli_imports_numpy_only(tmp_path):
+    os.makedirs(tmp_path / "models")
+    train_model.export_model(fit_forest(), tmp_path / predict.EXPORT_PATH)
+    script = (
+        "import sys, main\n"
+        "code = main.run_cli(['predict', '2.4'])\n"
+        "heavy = ['pandas', 'sklearn', 'joblib', 'win32com']\n"
+        "print('HEAVY:' + ','.join(m for m in heavy if m in sys.modules))\n"
+        "sys.exit(code)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert "AI SYNTHESIS RESULT" in proc.stdout
+    assert proc.stdout.rsplit("HEAVY:", 1)[-1].strip() == ""
@@ -0,0 +1,78 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from src.s11_metrics import analyze_spectra
+
+GRID = np.arange(1.0, 12.0)
+
+
+def v_dip(centre, depth=-20.0, slope=4.0):
+    """Piecewise-linear dip, so interpolated -10 dB crossings are exact."""
+    return np.minimum(depth + slope * np.abs(GRID - centre), -1.0)
+
+
+def test_parabolic_vertex_recovers_off_grid_minimum():
+    freqs = np.array([0.0, 1.0, 3.0, 4.0, 4.5, 6.0, 8.0])  # uneven spacing
+    mags = (freqs - 4.3) ** 2 - 20.0
+
+    m = analyze_spectra(freqs, mags)
+
+    assert_allclose(m["res_freq"], [4.3])
+    assert_allclose(m["s11_min"], [-20.0])
+
+
+def test_band_edges_are_interpolated_between_grid_points():
+    m = analyze_spectra(GRID, v_dip(6.0))
+
+    assert_allclose(m["res_freq"], [6.0])
+    assert_allclose(m["f_low"], [3.5])
+    assert_allclose(m["f_high"], [8.5])
+    assert_allclose(m["bandwidth"], [5.0])
+    assert_allclose(m["frac_bw"], [5.0 / 6.0])
+
+
+def test_band_running_off_the_sweep_is_cut_at_the_edge():
+    mags = -20.0 + 4.0 * (GRID - 1.0)  # deepest at the first point
+
+    m = analyze_spectra(GRID, mags)
+
+    assert_allclose(m["res_freq"], [1.0])
+    assert_allclose(m["s11_min"], [-20.0])
+    assert_allclose(m["f_low"], [1.0])
+    assert_allclose(m["f_high"], [3.5])
+    assert m["n_res"][0] == 1
+
+
+def test_resonances_are_packed_and_nan_padded_across_the_batch():
+    mags = np.stack(
+        [
+            np.minimum(v_dip(3.0, depth=-15.0), v_dip(9.0)),
+            v_dip(6.0),
+            np.full(GRID.shape, -3.0),
+        ]
+    )
+
+    m = analyze_spectra(GRID, mags)
+
+    assert m["n_res"].tolist() == [2, 1, 0]
+    assert_allclose(m["res_freqs"], [[3.0, 9.0], [6.0, np.nan], [np.nan, np.nan]])
+    assert_allclose(m["res_s11"][0], [-15.0, -20.0])
+    # Primary metrics follow the deepest dip, not the first one
+    assert_allclose(m["res_freq"][:2], [9.0, 6.0])
+    assert_allclose(m["res_f_low"][0], [1.75, 6.5])
+    # The upper band is still below -10 dB at the last point of the sweep
+    assert_allclose(m["res_f_high"][0], [4.25, 11.0])
+    # Never matched: no band, but the deepest point is still reported
+    assert m["bandwidth"][2] == 0.0
+    assert np.isnan(m["f_low"][2]) and np.isnan(m["f_high"][2])
+
+
+def test_vertex_below_threshold_between_samples_is_not_a_band():
+    mags = [-2.0, -5.0, -9.98, -9.99, -8.0, -5.0, -2.0]
+
+    m = analyze_spectra(np.arange(1.0, 8.0), mags)
+
+    assert m["s11_min"][0] < -10.0  # the refined vertex does dip below
+    assert m["bandwidth"][0] == 0.0
+    assert np.isnan(m["f_low"][0]) and np.isnan(m["f_high"][0])
+    assert m["n_res"][0] == 0
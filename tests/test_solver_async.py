@@ -0,0 +1,134 @@
+import asyncio
+import threading
+
+import pytest
+
+from src import solver_async
+from src.solver_backend import FakeSolverBackend
+
+PARAMS = {"W": 40.0, "L": 30.0, "Ls": 12.0, "Ws": 3.0}
+# Any run that takes this long has deadlocked
+DEADLINE = 10.0
+
+
+def run(backends, n_jobs=5, **kwargs):
+    kwargs.setdefault("timeout", 0.2)
+    kwargs.setdefault("call_timeout", 0.2)
+    kwargs.setdefault("abort_grace", 0.1)
+    coro = solver_async.run_jobs(
+        backends, [dict(PARAMS) for _ in range(n_jobs)], verbose=False, **kwargs
+    )
+    return asyncio.run(asyncio.wait_for(coro, DEADLINE))
+
+
+class ConnectFails(FakeSolverBackend):
+    def connect(self):
+        raise Exception("no licence")
+
+
+class RebuildHangs(FakeSolverBackend):
+    """Hangs forever inside the parameter update of the given job."""
+
+    def __init__(self, hang_job, **kwargs):
+        super().__init__(abortable=False, **kwargs)
+        self.hang_job = hang_job
+        self.updates = 0
+
+    def apply_params(self, params):
+        self.updates += 1
+        if self.updates == self.hang_job:
+            threading.Event().wait()
+        super().apply_params(params)
+
+
+def test_all_jobs_succeed():
+    results = run([FakeSolverBackend(solve_time=0.01)])
+    assert [r["status"] for r in results] == ["ok"] * 5
+    assert [r["job"] for r in results] == list(range(5))
+    assert len(results[0]["freqs"]) == len(results[0]["mags"])
+
+
+def test_abortable_timeout_continues_on_same_backend():
+    backend = FakeSolverBackend(solve_time=0.01, hang_on=[2])
+    results = run([backend])
+    assert [r["status"] for r in results] == ["ok", "timeout", "ok", "ok", "ok"]
+    assert "aborted" in results[1]["error"]
+    assert backend.solves == 5
+
+
+def test_non_abortable_timeout_stops_run():
+    seen = []
+    backend = FakeSolverBackend(solve_time=0.01, hang_on=[2], abortable=False)
+    with pytest.raises(solver_async.SolverError, match="could not be aborted"):
+        run([backend], on_result=lambda r: seen.append(r["status"]))
+    # Finished jobs were still post-processed; nothing more was sent
+    assert seen == ["ok", "timeout"]
+    assert backend.solves == 2
+
+
+def test_non_abortable_timeout_retires_only_that_backend():
+    hung = FakeSolverBackend(solve_time=0.01, hang_on=[1], abortable=False)
+    healthy = FakeSolverBackend(solve_time=0.01)
+    results = run([hung, healthy], n_jobs=6)
+    statuses = [r["status"] for r in results]
+    assert len(results) == 6
+    assert statuses.count("timeout") == 1
+    assert statuses.count("ok") == 5
+    assert hung.solves == 1
+
+
+def test_hung_parameter_update_does_not_deadlock():
+    with pytest.raises(solver_async.SolverError, match="apply_params"):
+        run([RebuildHangs(hang_job=2, solve_time=0.01)])
+
+
+def test_failure_mid_run_is_reported_and_run_continues():
+    results = run([FakeSolverBackend(solve_time=0.01, fail_on=[3])])
+    assert [r["status"] for r in results] == ["ok", "ok", "error", "ok", "ok"]
+    assert "job 3" in results[2]["error"]
+
+
+def test_connect_failure_leaves_other_backends_running():
+    results = run([ConnectFails(), FakeSolverBackend(solve_time=0.01)])
+    assert [r["status"] for r in results] == ["ok"] * 5
+
+
+def test_blocked_connect_retires_backend():
+    class ConnectBlocks(FakeSolverBackend):
+        def connect(self):
+            threading.Event().wait()
+
+    results = run([ConnectBlocks(abortable=False), FakeSolverBackend(solve_time=0.01)])
+    assert [r["status"] for r in results] == ["ok"] * 5
+
+    with pytest.raises(solver_async.SolverError, match="connect"):
+        run([ConnectBlocks(abortable=False)])
+
+
+def test_connect_failure_on_every_backend_raises():
+    with pytest.raises(solver_async.SolverError, match="no licence"):
+        run([ConnectFails(), ConnectFails()])
+
+
+def test_post_processing_error_does_not_stop_run():
+    def on_result(result):
+        raise ValueError("bad row")
+
+    results = run([FakeSolverBackend(solve_time=0.01)], on_result=on_result)
+    assert [r["status"] for r in results] == ["ok"] * 5
+
+
+def test_cancel_aborts_running_solve():
+    backend = FakeSolverBackend(solve_time=30.0)
+
+    async def main():
+        task = asyncio.ensure_future(
+            solver_async.run_jobs([backend], [PARAMS], verbose=False)
+        )
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(asyncio.wait_for(main(), DEADLINE))
+    assert backend._abort.is_set()
@@ -0,0 +1,135 @@
+import os
+import random
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.multioutput import MultiOutputRegressor
+
+import main
+from src import predict, surrogate, train_model
+from src.data_generator import PARAM_BOUNDS, sample_params
+
+
+def response(X):
+    """Analytic stand-in for CST: half-wave patch resonance pulled by the slot."""
+    W, L, Ls, Ws = X.T
+    freq = 300.0 / (2 * L * np.sqrt(3.8)) * (1 - 0.01 * Ls * Ws / W)
+    return np.stack([freq, 0.1 * freq * (0.5 + Ws / 8.0)], axis=1)
+
+
+def fit_surrogate(path, objectives=("res_freq", "bandwidth")):
+    random.seed(0)
+    X = np.array(
+        [
+            [p[n] for n in surrogate.GEOMETRY]
+            for p in map(lambda _: sample_params(), range(300))
+        ]
+    )
+    Y = response(X)[:, : len(objectives)]
+    x_lo, x_hi = X.min(axis=0), X.max(axis=0)
+    y_mean, y_std = Y.mean(axis=0), Y.std(axis=0)
+    layers = surrogate.init_mlp(4, len(objectives))
+    Z = (X - x_lo) * 2.0 / (x_hi - x_lo) - 1.0
+    surrogate.fit_mlp(Z, (Y - y_mean) / y_std, layers, epochs=1500)
+    surrogate.save_surrogate(
+        path, layers, x_lo, x_hi, y_mean, y_std, list(objectives), PARAM_BOUNDS
+    )
+    return X, Y
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    root = tmp_path_factory.mktemp("run")
+    os.makedirs(root / "models")
+    X, Y = fit_surrogate(root / surrogate.SURROGATE_PATH)
+    forest = MultiOutputRegressor(
+        RandomForestRegressor(n_estimators=10, random_state=0)
+    ).fit(Y[:, :1], X)
+    train_model.export_model(forest, root / predict.EXPORT_PATH)
+    return root, surrogate.load_surrogate(root / surrogate.SURROGATE_PATH)
+
+
+def box(model, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(model["bounds_lo"], model["bounds_hi"], size=(n, 4))
+
+
+def test_jacobian_matches_finite_differences(trained):
+    _, model = trained
+    X = box(model, 8)
+    _, J = surrogate.evaluate(model, X)
+
+    eps = 1e-5
+    J_fd = np.stack(
+        [
+            (
+                surrogate.evaluate(model, X + eps * e)[0]
+                - surrogate.evaluate(model, X - eps * e)[0]
+            )
+            / (2 * eps)
+            for e in np.eye(4)
+        ],
+        axis=-1,
+    )
+    np.testing.assert_allclose(J, J_fd, atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "lo, hi",
+    [
+        # Bounds in GEOMETRY order: W, L, Ls, Ws
+        ([30.0, 25.0, 10.0, 2.0], [50.0, 40.0, 20.0, 8.0]),  # PARAM_BOUNDS
+        ([10.0, 10.0, 2.0, 2.0], [50.0, 40.0, 30.0, 60.0]),  # slot limits bind
+    ],
+)
+def test_project_satisfies_box_and_slot_constraints(lo, hi):
+    lo, hi = np.array(lo), np.array(hi)
+    X = np.random.default_rng(1).uniform(-20.0, 90.0, size=(500, 4))
+
+    P = surrogate.project(X, lo, hi)
+    W, L, Ls, Ws = P.T
+
+    tol = 1e-9
+    assert np.all(P >= lo - tol) and np.all(P <= hi + tol)
+    assert np.all(Ls <= W - 4.0 + tol)
+    assert np.all(Ws <= L / 2.0 - 2.0 + tol)
+
+
+def test_refine_converges_on_reachable_targets(trained):
+    _, model = trained
+    targets, _ = surrogate.evaluate(model, box(model, 200, seed=2))
+    X0 = box(model, 200, seed=3)
+
+    X, Y, converged = surrogate.refine_designs(model, targets, X0)
+
+    assert converged.all()
+    assert np.all(np.abs(Y - targets) <= surrogate.TOLERANCE)
+    np.testing.assert_allclose(surrogate.evaluate(model, X)[0], Y)
+
+
+def test_refine_flags_unreachable_target(trained):
+    _, model = trained
+    targets = np.array([[9.9, np.nan]])
+
+    _, _, converged = surrogate.refine_designs(model, targets, box(model, 1))
+
+    assert not converged[0]
+
+
+def test_bandwidth_target_needs_bandwidth_objective(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("models")
+    fit_surrogate(surrogate.SURROGATE_PATH, objectives=("res_freq",))
+
+    with pytest.raises(ValueError, match="bandwidth"):
+        predict.inverse_design([2.4], [0.2])
+
+
+def test_refine_cli_exit_codes(trained, monkeypatch):
+    root, model = trained
+    monkeypatch.chdir(root)
+    reachable = surrogate.evaluate(model, box(model, 1, seed=4))[0][0, 0]
+
+    assert main.run_cli(["refine", f"{reachable:.4f}"]) == 0
+    assert main.run_cli(["refine", "9.9"]) == 3